@@ -2,8 +2,50 @@
 
 import argparse
 import asyncio
+import atexit
+import logging
+import queue
+import sys
+from collections.abc import Coroutine
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
-from study_agent import run_app
+
+def _setup_logging() -> None:
+    """根 logger 的输出改经 QueueHandler 入队，由后台线程的 QueueListener 写出。
+
+    事件循环中的日志调用只做入队，不会因终端或日志文件的写入而阻塞。先导入
+    browser_use，让它按 BROWSER_USE_LOGGING_LEVEL 完成根 logger 的配置（已有根
+    handler 时它会跳过配置）；study_agent 日志照常向上传播，沿用其级别、格式与日志文件。
+
+    study_agent 需先于 browser_use 导入：包初始化时把本地 browser-use 目录加入
+    sys.path，并加载 .env。
+    """
+    import study_agent  # noqa: F401  设置 browser-use 的导入路径
+    import browser_use  # noqa: F401  导入时完成 browser-use 的日志配置
+
+    root = logging.getLogger()
+    if not root.handlers:
+        # BROWSER_USE_SETUP_LOGGING=false 时无人配置根 logger，保证运行提示仍可见
+        logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    if any(isinstance(h, QueueHandler) for h in root.handlers):
+        return
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    root.handlers = [QueueHandler(log_queue)]
+
+
+def _run(coro: Coroutine[Any, Any, None]) -> None:
+    """运行顶层协程；已安装 uvloop 时使用其事件循环（Windows 上不可用，回退 asyncio）。"""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(coro)
+        return
+    uvloop.run(coro)
 
 
 def main() -> None:
@@ -13,13 +55,16 @@ def main() -> None:
     parser.add_argument("--host", default="127.0.0.1", help="Web UI 监听地址")
     parser.add_argument("--port", type=int, default=7860, help="Web UI 端口")
     args = parser.parse_args()
+    _setup_logging()
 
     if args.web:
         from study_agent.web.server import start_server
 
-        asyncio.run(start_server(host=args.host, port=args.port))
+        _run(start_server(host=args.host, port=args.port))
     else:
-        asyncio.run(run_app())
+        from study_agent import run_app
+
+        _run(run_app())
 
 
 if __name__ == "__main__":
@@ -28,7 +28,6 @@ from study_agent.config import (
     save_config_to_yaml,
     validate_config,
 )
-from study_agent.app import StudyAgentApp, run_app
 from study_agent.event_bus import EventType, event_bus
 
 __all__ = [
@@ -45,3 +44,12 @@ __all__ = [
     "EventType",
     "event_bus",
 ]
+
+
+def __getattr__(name: str):
+    """按需加载 StudyAgentApp / run_app，避免仅使用配置等轻量接口时导入整个 browser-use。"""
+    if name in ("StudyAgentApp", "run_app"):
+        from study_agent import app
+
+        return getattr(app, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,13 +7,17 @@ StudyAgent 应用编排模块
 
 import asyncio
 import logging
+import os
 from datetime import datetime
 
 from browser_use import Agent, Tools
+from browser_use.browser import BrowserSession
+from browser_use.llm.base import BaseChatModel
+from browser_use.llm.messages import UserMessage
 
 from study_agent.config import AppConfig, load_config_from_yaml, validate_config
 from study_agent.prompts import BROWSER_AGENT_PROMPT, DEFAULT_TASK_DESCRIPTION
-from study_agent.llm_factory import create_llm_pair
+from study_agent.llm_factory import aclose_http_client, create_llm_pair, with_token_budget
 from study_agent.browser import create_browser_session
 from study_agent.tools.solver import register_solver_tool
 from study_agent.event_bus import EventBus, EventType
@@ -21,6 +25,26 @@ from study_agent.store.history import HistoryStore
 
 logger = logging.getLogger("study_agent")
 
+# browser-use 的 RESULT 日志级别（介于 WARNING 与 ERROR 之间）；横幅与结果摘要用此级别，
+# BROWSER_USE_LOGGING_LEVEL 设为 warning / result 时仍然可见
+_RESULT_LEVEL = 35
+
+
+# 预热只需建立连接、触发一次推理，输出几个 token 即可
+_WARMUP_MAX_TOKENS = 8
+
+
+async def _warmup_llm(llm: BaseChatModel) -> None:
+    """发送一次极短的请求以建立连接、预热服务端；失败不影响后续流程。
+
+    经由输出上限只有几个 token 的副本调用，不会按完整预算生成而拖慢启动；
+    副本与原实例共享同一 HTTP 客户端，建立的连接照样复用。
+    """
+    try:
+        await with_token_budget(llm, _WARMUP_MAX_TOKENS).ainvoke([UserMessage(content="请仅回复ok")])
+    except Exception as e:
+        logger.debug(f"LLM 预热失败：{e}")
+
 
 class StudyAgentApp:
     """StudyAgent 应用封装，可编程创建与运行。
@@ -30,9 +54,9 @@ class StudyAgentApp:
         app = StudyAgentApp()          # 使用环境变量默认配置
         await app.run()
 
-        # 或自定义配置
+        # 或自定义配置（配置对象不可变，使用 dataclasses.replace 派生）
         cfg = load_config()
-        cfg.agent.max_steps = 50
+        cfg = replace(cfg, agent=replace(cfg.agent, max_steps=50))
         app = StudyAgentApp(config=cfg)
         await app.run(task="只做选择题")
     """
@@ -89,8 +113,13 @@ class StudyAgentApp:
             },
         )
 
-        # 2. 创建 LLM
-        browser_llm, solver_llm = create_llm_pair(self.config)
+        # 2. 并行创建 LLM 与浏览器会话（两者互不依赖，CDP 地址解析为阻塞请求）
+        browser_llm, solver_llm, self._browser_session = await self._build_llms_and_browser()
+
+        # 可选：并行预热两个 LLM，让首道题不再承担冷启动延迟
+        if os.getenv("STUDY_AGENT_WARMUP", "false").lower() in ("true", "1", "yes"):
+            logger.info("🔥 预热 LLM 连接...")
+            await asyncio.gather(_warmup_llm(browser_llm), _warmup_llm(solver_llm))
 
         # 3. 注册 solver 工具
         tools = Tools()
@@ -101,16 +130,13 @@ class StudyAgentApp:
             history_store=self._history_store,
             session_id_getter=lambda: self._session_id,
         )
-        print("🔧 已注册自定义工具：solve_question")
+        logger.info("🔧 已注册自定义工具：solve_question")
 
-        # 4. 浏览器会话
-        self._browser_session = create_browser_session(self.config.browser)
-
-        # 5. 确定任务描述
+        # 4. 确定任务描述
         task_text = task or self.config.task_description or DEFAULT_TASK_DESCRIPTION
 
         try:
-            # 6. 创建 Browser Agent
+            # 5. 创建 Browser Agent
             ac = self.config.agent
             self._agent = Agent(
                 task=task_text,
@@ -149,16 +175,16 @@ class StudyAgentApp:
                     },
                 )
 
-            print()
-            print("🚀 Agent 开始做题...")
-            print("   架构：Browser Agent（操作页面）→ Solver Agent（解题推理）")
-            print("   （按 Ctrl+C 可随时中止）")
-            print()
+            logger.info("")
+            logger.info("🚀 Agent 开始做题...")
+            logger.info("   架构：Browser Agent（操作页面）→ Solver Agent（解题推理）")
+            logger.info("   （按 Ctrl+C 可随时中止）")
+            logger.info("")
 
-            # 7. 运行
+            # 6. 运行
             result = await self._agent.run(max_steps=ac.max_steps, on_step_end=_on_step_end)
 
-            # 8. 结果摘要
+            # 7. 结果摘要
             self._print_result(result)
             if self._is_stopped:
                 self._status = "stopped"
@@ -195,7 +221,7 @@ class StudyAgentApp:
                     )
 
         except KeyboardInterrupt:
-            print("\n\n⏹️  用户中止，正在清理...")
+            logger.info("\n\n⏹️  用户中止，正在清理...")
             self._status = "stopped"
             self._status_detail = "keyboard_interrupt"
             await self._emit(EventType.TASK_STOPPED, {"reason": "keyboard_interrupt"})
@@ -234,12 +260,16 @@ class StudyAgentApp:
             await self.cleanup()
 
     async def cleanup(self) -> None:
-        """断开浏览器连接（不会关闭用户的 Chrome）。"""
+        """断开浏览器连接（不会关闭用户的 Chrome）。
+
+        LLM 的共享 HTTP 客户端为进程级资源（Web 模式下配置校验等请求也在使用），
+        不在此关闭，由进程入口（run_app / Web 服务器退出）负责释放。
+        """
         if self._browser_session:
-            print("🔌 断开浏览器连接...")
+            logger.info("🔌 断开浏览器连接...")
             await self._browser_session.kill()
             self._browser_session = None
-            print("👋 已退出。")
+            logger.info("👋 已退出。")
 
     def pause(self) -> None:
         """暂停任务。"""
@@ -287,44 +317,62 @@ class StudyAgentApp:
     # ----------------------------------------------------------
     # 内部方法
     # ----------------------------------------------------------
+    async def _build_llms_and_browser(self) -> tuple[BaseChatModel, BaseChatModel, BrowserSession]:
+        """在工作线程中并行创建 LLM 对与浏览器会话，重叠两者的初始化耗时。"""
+        try:
+            async with asyncio.TaskGroup() as tg:
+                llm_task = tg.create_task(asyncio.to_thread(create_llm_pair, self.config))
+                browser_task = tg.create_task(
+                    asyncio.to_thread(create_browser_session, self.config.browser)
+                )
+        except ExceptionGroup as eg:
+            # 解包 TaskGroup 的 ExceptionGroup，向调用方抛出与串行创建时相同类型的异常
+            raise eg.exceptions[0] from None
+
+        browser_llm, solver_llm = llm_task.result()
+        return browser_llm, solver_llm, browser_task.result()
+
     @staticmethod
     def _print_banner() -> None:
-        print("=" * 60)
-        print("  📚 StudyAgent — 自动做题 Agent（双 Agent 架构）")
-        print("=" * 60)
-        print()
+        logger.log(_RESULT_LEVEL, "=" * 60)
+        logger.log(_RESULT_LEVEL, "  📚 StudyAgent — 自动做题 Agent（双 Agent 架构）")
+        logger.log(_RESULT_LEVEL, "=" * 60)
+        logger.log(_RESULT_LEVEL, "")
 
     @staticmethod
     def _print_result(result) -> None:
-        print()
-        print("=" * 60)
-        print("  ✅ 做题完成！")
-        print("=" * 60)
+        logger.log(_RESULT_LEVEL, "")
+        logger.log(_RESULT_LEVEL, "=" * 60)
+        logger.log(_RESULT_LEVEL, "  ✅ 做题完成！")
+        logger.log(_RESULT_LEVEL, "=" * 60)
         if result:
             final = result.final_result()
             if final:
-                print(f"📋 结果摘要：{final}")
-            print(f"📊 总步骤数：{len(result.history)}")
+                logger.log(_RESULT_LEVEL, f"📋 结果摘要：{final}")
+            logger.log(_RESULT_LEVEL, f"📊 总步骤数：{len(result.history)}")
             errors = result.errors()
             if errors:
-                print(f"⚠️  遇到 {len(errors)} 个错误")
+                logger.log(_RESULT_LEVEL, f"⚠️  遇到 {len(errors)} 个错误")
 
     @staticmethod
     def _handle_error(e: Exception) -> None:
         error_msg = str(e)
         if "connect" in error_msg.lower() or "cdp" in error_msg.lower():
-            print("\n❌ 无法连接到 Chrome，请检查：")
-            print("   1. Chrome 是否已以 debug 模式启动？")
-            print('   2. 启动命令：chrome.exe --remote-debugging-port=9222 --user-data-dir="C:\\chrome-debug-profile"')
-            print("   3. 验证方式：浏览器访问 http://localhost:9222/json/version")
+            logger.error("\n❌ 无法连接到 Chrome，请检查：")
+            logger.error("   1. Chrome 是否已以 debug 模式启动？")
+            logger.error('   2. 启动命令：chrome.exe --remote-debugging-port=9222 --user-data-dir="C:\\chrome-debug-profile"')
+            logger.error("   3. 验证方式：浏览器访问 http://localhost:9222/json/version")
         else:
-            print(f"\n❌ 运行出错：{e}")
+            logger.error(f"\n❌ 运行出错：{e}")
 
 
 # ============================================================
 # 便捷函数（供 main.py 直接调用）
 # ============================================================
 async def run_app(task: str | None = None, config: AppConfig | None = None) -> None:
-    """一键运行 StudyAgent。"""
+    """一键运行 StudyAgent，结束后释放 LLM 的共享 HTTP 连接池。"""
     app = StudyAgentApp(config=config)
-    await app.run(task=task)
+    try:
+        await app.run(task=task)
+    finally:
+        await aclose_http_client()
@@ -5,6 +5,7 @@ StudyAgent 浏览器连接模块
 """
 
 import json
+import logging
 from urllib.parse import urljoin
 from urllib.request import urlopen
 
@@ -12,6 +13,8 @@ from browser_use.browser import BrowserProfile, BrowserSession
 
 from study_agent.config import BrowserConfig
 
+logger = logging.getLogger("study_agent")
+
 
 def _resolve_cdp_url(cdp_url: str) -> str:
     """将 HTTP CDP 地址解析为 websocket 调试地址。"""
@@ -42,7 +45,7 @@ def create_browser_session(config: BrowserConfig | None = None) -> BrowserSessio
     """创建连接到本地 Chrome 的 BrowserSession。"""
     config = config or BrowserConfig()
     resolved_cdp_url = _resolve_cdp_url(config.cdp_url)
-    print(f"🌐 连接 Chrome CDP：{resolved_cdp_url}")
+    logger.info(f"🌐 连接 Chrome CDP：{resolved_cdp_url}")
 
     return BrowserSession(
         browser_profile=BrowserProfile(
@@ -8,7 +8,7 @@ StudyAgent 配置管理模块
 
 import os
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -23,7 +23,7 @@ CONFIG_FILE = Path("config.yaml")
 # ============================================================
 # 数据类：LLM 配置
 # ============================================================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMConfig:
     """单个 LLM 的配置信息。"""
     provider: str  # openai / anthropic / google
@@ -32,7 +32,7 @@ class LLMConfig:
     max_completion_tokens: int | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BrowserConfig:
     """浏览器连接配置。"""
     cdp_url: str = "http://localhost:9222"
@@ -43,7 +43,7 @@ class BrowserConfig:
     cdp_port: int = 9222
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentConfig:
     """Agent 运行时配置。"""
     use_vision: bool = True
@@ -56,13 +56,20 @@ class AgentConfig:
     demo_mode: bool = True
 
 
-@dataclass
+# 配置对象不可变，默认实例可安全地在多个 AppConfig 之间共享。
+# slots 类不保留类属性形式的默认值，读取默认值请使用这些实例。
+_DEFAULT_LLM = LLMConfig(provider="openai")
+_DEFAULT_BROWSER = BrowserConfig()
+_DEFAULT_AGENT = AgentConfig()
+
+
+@dataclass(slots=True, frozen=True)
 class AppConfig:
     """应用顶层配置，聚合所有子配置。"""
-    browser_llm: LLMConfig = field(default_factory=lambda: LLMConfig(provider="openai"))
-    solver_llm: LLMConfig = field(default_factory=lambda: LLMConfig(provider="openai"))
-    browser: BrowserConfig = field(default_factory=BrowserConfig)
-    agent: AgentConfig = field(default_factory=AgentConfig)
+    browser_llm: LLMConfig = _DEFAULT_LLM
+    solver_llm: LLMConfig = _DEFAULT_LLM
+    browser: BrowserConfig = _DEFAULT_BROWSER
+    agent: AgentConfig = _DEFAULT_AGENT
     task_description: str = ""
 
 
@@ -70,24 +77,28 @@ class AppConfig:
 # 从环境变量构建配置
 # ============================================================
 def load_config() -> AppConfig:
-    """从环境变量读取所有配置，返回 AppConfig 实例。"""
-    default_provider = os.getenv("DEFAULT_PROVIDER", "openai").lower()
+    """从环境变量读取所有配置，返回 AppConfig 实例。
+
+    入口处对 ``os.environ`` 做一次快照，整个读取过程基于同一份环境变量。
+    """
+    env = dict(os.environ)
+    default_provider = env.get("DEFAULT_PROVIDER", "openai").lower()
 
     # Browser LLM
-    b_provider = os.getenv("BROWSER_PROVIDER", default_provider).lower()
-    b_model = os.getenv("BROWSER_MODEL", None)
-    b_base_url = os.getenv("BROWSER_BASE_URL", None)
+    b_provider = env.get("BROWSER_PROVIDER", default_provider).lower()
+    b_model = env.get("BROWSER_MODEL", None)
+    b_base_url = env.get("BROWSER_BASE_URL", None)
 
     # Solver LLM
-    s_provider = os.getenv("SOLVER_PROVIDER", default_provider).lower()
-    s_model = os.getenv("SOLVER_MODEL", None)
-    s_base_url = os.getenv("SOLVER_BASE_URL", None)
+    s_provider = env.get("SOLVER_PROVIDER", default_provider).lower()
+    s_model = env.get("SOLVER_MODEL", None)
+    s_base_url = env.get("SOLVER_BASE_URL", None)
 
     # Solver 若为 OpenAI，默认设置 max_completion_tokens
     s_max_tokens = 16384 if s_provider == "openai" else None
 
     # Browser 连接
-    cdp_url = os.getenv("CDP_URL", "http://localhost:9222")
+    cdp_url = env.get("CDP_URL", "http://localhost:9222")
 
     return AppConfig(
         browser_llm=LLMConfig(
@@ -202,31 +213,31 @@ def load_config_from_yaml(path: Path = CONFIG_FILE) -> AppConfig:
             cdp_url=cdp_url,
             minimum_wait_page_load_time=_to_float(
                 browser_raw.get("minimum_wait_page_load_time"),
-                BrowserConfig.minimum_wait_page_load_time,
+                _DEFAULT_BROWSER.minimum_wait_page_load_time,
             ),
             wait_for_network_idle_page_load_time=_to_float(
                 browser_raw.get("wait_for_network_idle_page_load_time"),
-                BrowserConfig.wait_for_network_idle_page_load_time,
+                _DEFAULT_BROWSER.wait_for_network_idle_page_load_time,
             ),
             wait_between_actions=_to_float(
                 browser_raw.get("wait_between_actions"),
-                BrowserConfig.wait_between_actions,
+                _DEFAULT_BROWSER.wait_between_actions,
             ),
             auto_launch_chrome=_to_bool(browser_raw.get("auto_launch_chrome"), False),
             cdp_port=cdp_port,
         ),
         agent=AgentConfig(
-            use_vision=_to_bool(agent_raw.get("use_vision"), AgentConfig.use_vision),
-            use_thinking=_to_bool(agent_raw.get("use_thinking"), AgentConfig.use_thinking),
+            use_vision=_to_bool(agent_raw.get("use_vision"), _DEFAULT_AGENT.use_vision),
+            use_thinking=_to_bool(agent_raw.get("use_thinking"), _DEFAULT_AGENT.use_thinking),
             max_actions_per_step=_to_int(
                 agent_raw.get("max_actions_per_step"),
-                AgentConfig.max_actions_per_step,
+                _DEFAULT_AGENT.max_actions_per_step,
             ),
-            max_failures=_to_int(agent_raw.get("max_failures"), AgentConfig.max_failures),
-            max_steps=_to_int(agent_raw.get("max_steps"), AgentConfig.max_steps),
-            enable_planning=_to_bool(agent_raw.get("enable_planning"), AgentConfig.enable_planning),
-            use_judge=_to_bool(agent_raw.get("use_judge"), AgentConfig.use_judge),
-            demo_mode=_to_bool(agent_raw.get("demo_mode"), AgentConfig.demo_mode),
+            max_failures=_to_int(agent_raw.get("max_failures"), _DEFAULT_AGENT.max_failures),
+            max_steps=_to_int(agent_raw.get("max_steps"), _DEFAULT_AGENT.max_steps),
+            enable_planning=_to_bool(agent_raw.get("enable_planning"), _DEFAULT_AGENT.enable_planning),
+            use_judge=_to_bool(agent_raw.get("use_judge"), _DEFAULT_AGENT.use_judge),
+            demo_mode=_to_bool(agent_raw.get("demo_mode"), _DEFAULT_AGENT.demo_mode),
         ),
         task_description=str(raw.get("task_description") or ""),
     )
@@ -4,17 +4,72 @@ StudyAgent LLM 工厂模块
 根据配置信息创建不同提供商的 LLM 实例。
 """
 
+from __future__ import annotations
+
+import dataclasses
+import functools
+import importlib.util
 import logging
 import os
-
-from browser_use.llm import ChatOpenAI, ChatAnthropic
-from browser_use.llm.google.chat import ChatGoogle
-from browser_use.llm.base import BaseChatModel
+from typing import TYPE_CHECKING
 
 from study_agent.config import LLMConfig, AppConfig
 
+# browser-use 及各 Provider SDK 导入开销较大，仅在实际创建对应 LLM 时加载
+if TYPE_CHECKING:
+    import httpx
+    from browser_use.llm import ChatOpenAI, ChatAnthropic
+    from browser_use.llm.google.chat import ChatGoogle
+    from browser_use.llm.base import BaseChatModel
+
 logger = logging.getLogger("study_agent")
 
+# 影响 LLM 实例构造的环境变量，纳入缓存键以便配置变更后重新创建
+_ENV_KEYS = (
+    "OPENAI_API_KEY",
+    "OPENAI_MODEL",
+    "OPENAI_BASE_URL",
+    "OPENAI_NO_STRUCTURED_OUTPUT",
+    "ANTHROPIC_API_KEY",
+    "ANTHROPIC_MODEL",
+    "GOOGLE_API_KEY",
+    "GOOGLE_MODEL",
+)
+
+# 各 Provider 的输出 token 上限字段名
+_TOKEN_LIMIT_FIELDS = ("max_completion_tokens", "max_tokens", "max_output_tokens")
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """返回进程内共享的 HTTP 客户端（首次使用时创建），Browser 与 Solver 复用同一连接池。
+
+    安装了 h2 时启用 HTTP/2，并发请求可在同一 TCP/TLS 连接上多路复用。空闲连接保留
+    较长时间：两道题之间的间隔（浏览器操作）常超过 httpx 默认的 5 秒，否则每次
+    Solver 调用都要重新建立 TLS 连接。
+    """
+    global _http_client
+    import httpx
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            # 读超时由各 SDK 按请求设置，这里只收紧建连超时
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256, keepalive_expiry=120.0),
+        )
+    return _http_client
+
+
+async def aclose_http_client() -> None:
+    """关闭共享 HTTP 客户端，并清空持有该客户端的 LLM 实例缓存。"""
+    global _http_client
+    client, _http_client = _http_client, None
+    _create_llm_cached.cache_clear()
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
 
 def _create_openai_llm(config: LLMConfig) -> ChatOpenAI:
     """创建 OpenAI LLM 实例。
@@ -22,10 +77,12 @@ def _create_openai_llm(config: LLMConfig) -> ChatOpenAI:
     当环境变量 OPENAI_NO_STRUCTURED_OUTPUT=true 时，禁用 json_schema 结构化输出，
     改为将 schema 注入系统提示词。适用于不支持 response_format: json_schema 的第三方 API。
     """
+    from browser_use.llm import ChatOpenAI
+
     model = config.model or os.getenv("OPENAI_MODEL", "gpt-4o")
     base_url = config.base_url or os.getenv("OPENAI_BASE_URL", None)
 
-    kwargs: dict = {"model": model}
+    kwargs: dict = {"model": model, "http_client": _get_http_client()}
     if base_url:
         kwargs["base_url"] = base_url
     if config.max_completion_tokens is not None:
@@ -45,12 +102,16 @@ def _create_openai_llm(config: LLMConfig) -> ChatOpenAI:
 
 def _create_anthropic_llm(config: LLMConfig) -> ChatAnthropic:
     """创建 Anthropic LLM 实例。"""
+    from browser_use.llm import ChatAnthropic
+
     model = config.model or os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
-    return ChatAnthropic(model=model)
+    return ChatAnthropic(model=model, http_client=_get_http_client())
 
 
 def _create_google_llm(config: LLMConfig) -> ChatGoogle:
     """创建 Google LLM 实例。"""
+    from browser_use.llm.google.chat import ChatGoogle
+
     model = config.model or os.getenv("GOOGLE_MODEL", "gemini-2.0-flash")
     return ChatGoogle(model=model)
 
@@ -62,12 +123,40 @@ _FACTORY_MAP = {
 }
 
 
+def _hashable_key(config: LLMConfig) -> tuple:
+    """将 LLMConfig（不可变、可哈希）及相关环境变量组合为缓存键。"""
+    return (config, tuple(os.getenv(name) for name in _ENV_KEYS))
+
+
+@functools.lru_cache(maxsize=8)
+def _create_llm_cached(key: tuple) -> BaseChatModel:
+    config = key[0]
+    return _FACTORY_MAP[config.provider](config)
+
+
 def create_llm(config: LLMConfig) -> BaseChatModel:
-    """根据 LLMConfig 创建对应提供商的 LLM 实例。"""
-    factory = _FACTORY_MAP.get(config.provider)
-    if factory is None:
+    """根据 LLMConfig 创建对应提供商的 LLM 实例。相同配置复用已创建的实例。"""
+    if config.provider not in _FACTORY_MAP:
         raise ValueError(f"不支持的 Provider: {config.provider}")
-    return factory(config)
+    return _create_llm_cached(_hashable_key(config))
+
+
+def with_token_budget(llm: BaseChatModel, budget: int) -> BaseChatModel:
+    """返回输出 token 上限不超过 ``budget`` 的 LLM 副本。
+
+    browser-use 的 Chat 模型均为 dataclass，上限字段名因 Provider 而异；
+    已配置的上限更小、或无法识别上限字段时原样返回。
+    """
+    if not dataclasses.is_dataclass(llm) or isinstance(llm, type):
+        return llm
+    for name in _TOKEN_LIMIT_FIELDS:
+        if not hasattr(llm, name):
+            continue
+        current = getattr(llm, name)
+        if current is not None and current <= budget:
+            return llm
+        return dataclasses.replace(llm, **{name: budget})
+    return llm
 
 
 def create_llm_pair(app_config: AppConfig) -> tuple[BaseChatModel, BaseChatModel]:
@@ -75,13 +164,13 @@ def create_llm_pair(app_config: AppConfig) -> tuple[BaseChatModel, BaseChatModel
     bc = app_config.browser_llm
     sc = app_config.solver_llm
 
-    print(f'🤖 Browser Agent: {bc.provider.upper()} (Model: {bc.model or "Default"})')
+    logger.info(f'🤖 Browser Agent: {bc.provider.upper()} (Model: {bc.model or "Default"})')
     if bc.base_url:
-        print(f"   API Base: {bc.base_url}")
+        logger.info(f"   API Base: {bc.base_url}")
 
-    print(f'🧠 Solver Agent: {sc.provider.upper()} (Model: {sc.model or "Default"})')
+    logger.info(f'🧠 Solver Agent: {sc.provider.upper()} (Model: {sc.model or "Default"})')
     if sc.base_url:
-        print(f"   API Base: {sc.base_url}")
+        logger.info(f"   API Base: {sc.base_url}")
 
     browser_llm = create_llm(bc)
     solver_llm = create_llm(sc)
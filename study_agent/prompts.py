@@ -99,6 +99,7 @@ BROWSER_AGENT_PROMPT = """
 - 如果题目中包含**图片、图表、几何图形、函数图像、化学结构式、电路图、地图**等视觉元素，调用 solve_question 时必须设置 `include_screenshot=true`
 - 如果题目是纯文字（没有视觉元素），保持 `include_screenshot=false` 以节省资源
 - 当设置 `include_screenshot=true` 时，当前页面截图会自动发送给解题模型
+- 截图默认以低精度（`image_detail="low"`）发送；只有题目依赖几何图形、函数图像、图表中的细小刻度或文字等精细视觉信息时，才设置 `image_detail="high"`
 - 即使设置了 `include_screenshot=true`，仍然要在 question 参数中尽量描述题目文字内容，因为截图和文字描述互补
 
 ### 重要注意事项
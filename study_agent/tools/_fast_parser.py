@@ -0,0 +1,73 @@
+"""
+Solver 输出解析（热路径纯函数）
+
+本模块只包含带完整类型注解的纯字符串函数，可用 mypyc 编译为扩展模块::
+
+    pip install mypy
+    mypyc study_agent/tools/_fast_parser.py
+
+编译产物（.so / .pyd）与本文件同名，导入时 Python 会优先加载；未编译时直接使用
+本文件，调用方无需区分。
+"""
+
+import re
+from typing import Final
+
+# Solver 输出格式标记；正则（导入时编译一次）仅在标记不规范时作为回退：
+# 大小写不一致、冒号前有空格或使用全角冒号（如 "ANSWER：" / "Reasoning :"）
+ANSWER_MARKER: Final = "ANSWER:"
+REASONING_MARKER: Final = "REASONING:"
+_ANSWER_RE: Final = re.compile(r"ANSWER\s*[:：]\s*(.*?)(?:REASONING\s*[:：]\s*(.*))?$", re.S | re.I)
+# 已找到标准 ANSWER 标记时只在其后查找的 REASONING 标记（仅放宽冒号，大小写须一致，
+# 避免把答案正文中的 "reasoning:" 误当作分隔）
+_REASONING_RE: Final = re.compile(r"REASONING\s*[:：]")
+
+# 题型 → 下标；未知题型按 auto 处理。各题型查找表均按该下标索引
+QTYPE_IDX: Final = {"choice": 0, "judge": 1, "fill": 2, "essay": 3, "auto": 4}
+QTYPE_AUTO: Final = 4
+
+# 各题型返回给 Browser Agent 的推理文本上限（字符）
+QTYPE_LIMITS: Final = (200, 150, 300, 1500, 500)
+
+
+def parse_solver_response(answer_text: str) -> tuple[str, str]:
+    """从 Solver 返回的文本中解析 ANSWER 和 REASONING 部分。
+
+    标准格式走 ``str.find`` 单次扫描 + 切片；找到标准 ANSWER 标记时只在其后查找
+    （冒号放宽的）REASONING 标记，完全没有标准 ANSWER 标记时才回退到全文正则。
+
+    Returns:
+        (answer_part, reasoning_part)
+    """
+    a_idx = answer_text.find(ANSWER_MARKER)
+    if a_idx >= 0:
+        start = a_idx + len(ANSWER_MARKER)
+        r_idx = answer_text.find(REASONING_MARKER, start)
+        if r_idx >= 0:
+            return answer_text[start:r_idx].strip(), answer_text[r_idx + len(REASONING_MARKER):].strip()
+        r_match = _REASONING_RE.search(answer_text, start)
+        if r_match is None:
+            return answer_text[start:].strip(), ""
+        return answer_text[start:r_match.start()].strip(), answer_text[r_match.end():].strip()
+
+    match = _ANSWER_RE.search(answer_text)
+    if match is None:
+        return answer_text, ""
+    return match.group(1).strip(), (match.group(2) or "").strip()
+
+
+def has_answer_marker(answer_text: str) -> bool:
+    """判断文本中是否含有 ANSWER 标记（含大小写、冒号不规范的写法）。"""
+    return ANSWER_MARKER in answer_text or _ANSWER_RE.search(answer_text) is not None
+
+
+def truncate_reasoning(reasoning: str, question_type: str, max_len: int | None = None) -> str:
+    """根据题目类型截断推理文本，避免返回内容过长。
+
+    调用方已解析出截断长度时可直接传入 ``max_len``，省去按题型查表。
+    """
+    if max_len is None:
+        max_len = QTYPE_LIMITS[QTYPE_IDX.get(question_type, QTYPE_AUTO)]
+    if len(reasoning) <= max_len:
+        return reasoning
+    return reasoning[:max_len] + "...(推理已截断)"
@@ -0,0 +1,284 @@
+"""
+Solver 语义缓存
+
+以句向量余弦相似度匹配曾经解答过的题目（措辞或空白略有差异），命中时直接复用
+答案，跳过 Solver 调用。只在题型、答案格式要求与截图均一致的记录间比较；选项
+顺序可能变化的选择题由调用方排除，不走语义缓存。缓存以 JSONL 持久化，重启后仍然有效。
+
+依赖 sentence-transformers 与 numpy（可选依赖，未安装时语义缓存自动停用）::
+
+    pip install sentence-transformers
+
+通过环境变量 SOLVER_SEMANTIC_CACHE=true 启用。题干相似但数字不同的题目
+可能被误判为同一题，因此默认关闭，阈值可用 SOLVER_SEMANTIC_CACHE_THRESHOLD 调整。
+题目以中文为主，默认使用多语言句向量模型，可用 SOLVER_SEMANTIC_CACHE_MODEL 替换。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger("study_agent")
+
+CACHE_PATH = Path.home() / ".studyagent" / "solver_cache.jsonl"
+DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_THRESHOLD = 0.87
+DEFAULT_MAX_ENTRIES = 1000
+
+_MODEL_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_model(model_name: str) -> Any:
+    """加载句向量模型；同名模型在进程内只加载一次，各缓存实例共用。"""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device="cpu")
+
+
+@dataclass
+class _Entry:
+    """一条缓存记录；向量存放在缓存矩阵的第 ``slot`` 行。"""
+
+    question: str
+    question_type: str
+    format_hint: str
+    screenshot_digest: str | None
+    answer: str
+    reasoning: str
+    slot: int
+
+
+class SemanticAnswerCache:
+    """基于句向量相似度的 Solver 答案缓存（进程内 LRU + JSONL 持久化）。
+
+    全部向量保存在一个 (max_entries, dim) 的 float32 矩阵中，查询时一次矩阵-向量
+    乘法即得到与所有记录的余弦相似度；淘汰的记录将其所在行清零并让出给新记录。
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        model_name: str = DEFAULT_MODEL_NAME,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._matrix: np.ndarray | None = None
+        self._slot_keys: list[str | None] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        # 各 (题型, 格式要求, 截图摘要) 组合下的记录数，无可比记录时省去查询编码
+        self._partitions: Counter[tuple[str, str, str | None]] = Counter()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    # ----------------------------------------------------------
+    # 公开方法
+    # ----------------------------------------------------------
+    async def lookup(
+        self,
+        question: str,
+        question_type: str,
+        format_hint: str,
+        screenshot_digest: str | None,
+    ) -> tuple[str, str] | None:
+        """查找相似题目，命中时返回 (answer_part, reasoning_part)。
+
+        仅在题型、答案格式要求一致且截图摘要一致（或均无截图）的记录中比较相似度。
+        """
+        import numpy as np
+
+        await self._ensure_loaded()
+        partition = (question_type, format_hint, screenshot_digest)
+        if not self._partitions[partition] or self._matrix is None:
+            return None
+
+        query = (await asyncio.to_thread(self._encode, [question]))[0]
+        scores = self._matrix @ query
+        # 空行相似度为 0，不会超过阈值；按相似度从高到低找第一条题型与截图一致的记录
+        hits = np.flatnonzero(scores >= self.threshold)
+        for slot in hits[np.argsort(scores[hits])[::-1]]:
+            key = self._slot_keys[slot]
+            if key is None:
+                continue
+            entry = self._entries[key]
+            if self._partition_of(entry) != partition:
+                continue
+            self._entries.move_to_end(key)
+            logger.info("♻️ 语义缓存命中（相似度 %.3f）：%.60s", float(scores[slot]), entry.question)
+            return entry.answer, entry.reasoning
+        return None
+
+    async def add(
+        self,
+        question: str,
+        question_type: str,
+        format_hint: str,
+        screenshot_digest: str | None,
+        answer: str,
+        reasoning: str,
+    ) -> None:
+        """写入一条记录并追加到 JSONL 文件。"""
+        await self._ensure_loaded()
+        embedding = (await asyncio.to_thread(self._encode, [question]))[0]
+        record = {
+            "question": question,
+            "question_type": question_type,
+            "format_hint": format_hint,
+            "screenshot_digest": screenshot_digest,
+            "answer": answer,
+            "reasoning": reasoning,
+        }
+        self._put(record, embedding)
+        try:
+            await asyncio.to_thread(self._append_record, record)
+        except OSError as e:
+            logger.warning("⚠️ 语义缓存写入失败：%s", e)
+
+    # ----------------------------------------------------------
+    # 内部方法
+    # ----------------------------------------------------------
+    @staticmethod
+    def _entry_key(record: dict) -> str:
+        raw = (
+            f"{record['question_type']}|{record['format_hint']}|"
+            f"{record['screenshot_digest'] or ''}|{record['question']}"
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _partition_of(entry: _Entry) -> tuple[str, str, str | None]:
+        return entry.question_type, entry.format_hint, entry.screenshot_digest
+
+    def _put(self, record: dict, embedding: np.ndarray) -> None:
+        import numpy as np
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+        key = self._entry_key(record)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._partitions[self._partition_of(old)] -= 1
+            slot = old.slot
+        else:
+            if not self._free_slots:
+                self._evict_oldest()
+            slot = self._free_slots.pop()
+
+        self._matrix[slot] = embedding
+        self._slot_keys[slot] = key
+        self._entries[key] = _Entry(slot=slot, **record)
+        self._partitions[self._partition_of(self._entries[key])] += 1
+
+    def _evict_oldest(self) -> None:
+        """淘汰最久未使用的记录，清零其向量并回收所在行。"""
+        _, entry = self._entries.popitem(last=False)
+        self._partitions[self._partition_of(entry)] -= 1
+        if self._matrix is not None:
+            self._matrix[entry.slot] = 0.0
+        self._slot_keys[entry.slot] = None
+        self._free_slots.append(entry.slot)
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """批量编码为 L2 归一化的 float32 向量，形状 (len(texts), dim)。"""
+        import numpy as np
+
+        with _MODEL_LOCK:
+            model = _load_model(self.model_name)
+        vectors = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+    async def _ensure_loaded(self) -> None:
+        """首次使用时加载持久化记录（仅保留最近 max_entries 条）。"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            records, total = await asyncio.to_thread(self._read_records)
+            if records:
+                embeddings = await asyncio.to_thread(self._encode, [r["question"] for r in records])
+                for record, embedding in zip(records, embeddings):
+                    self._put(record, embedding)
+            if total > 2 * self.max_entries:
+                # 文件只追加写入，积累过多时按保留的记录重写
+                await asyncio.to_thread(self._rewrite_records, records)
+            self._loaded = True
+            if records:
+                logger.info("📚 已加载 %d 条语义缓存记录", len(records))
+
+    def _read_records(self) -> tuple[list[dict], int]:
+        """读取持久化记录，返回 (最近 max_entries 条记录, 有效记录总数)。"""
+        if not self.path.exists():
+            return [], 0
+        records: list[dict] = []
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and {"question", "question_type", "answer"} <= record.keys():
+                    records.append(
+                        {
+                            "question": str(record["question"]),
+                            "question_type": str(record["question_type"]),
+                            "format_hint": str(record.get("format_hint") or ""),
+                            "screenshot_digest": record.get("screenshot_digest"),
+                            "answer": str(record["answer"]),
+                            "reasoning": str(record.get("reasoning") or ""),
+                        }
+                    )
+        return records[-self.max_entries:], len(records)
+
+    def _rewrite_records(self, records: list[dict]) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _append_record(self, record: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+_semantic_cache: SemanticAnswerCache | None = None
+
+
+def get_semantic_cache() -> SemanticAnswerCache | None:
+    """返回进程内共享的语义缓存；未启用或缺少依赖时返回 None。"""
+    global _semantic_cache
+    if os.getenv("SOLVER_SEMANTIC_CACHE", "false").lower() not in ("true", "1", "yes"):
+        return None
+    if _semantic_cache is None:
+        try:
+            import numpy  # noqa: F401
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            logger.warning("⚠️ 未安装 sentence-transformers，语义缓存已停用")
+            return None
+        try:
+            threshold = float(os.getenv("SOLVER_SEMANTIC_CACHE_THRESHOLD", str(DEFAULT_THRESHOLD)))
+        except ValueError:
+            threshold = DEFAULT_THRESHOLD
+        model_name = os.getenv("SOLVER_SEMANTIC_CACHE_MODEL") or DEFAULT_MODEL_NAME
+        _semantic_cache = SemanticAnswerCache(model_name=model_name, threshold=threshold)
+    return _semantic_cache
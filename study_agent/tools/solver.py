@@ -4,16 +4,27 @@ StudyAgent Solver Tool
 定义 solve_question 自定义工具——调用独立的 Solver LLM 进行解题。
 """
 
-import base64
+import asyncio
+import hashlib
+import io
 import logging
+import os
+import re
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Callable
+from functools import cached_property
+from typing import Any, Callable, Literal
 
-from pydantic import BaseModel, Field
+from openai import APIConnectionError, APIStatusError, RateLimitError
+from PIL import Image
+from pydantic import BaseModel, Field, field_validator
 
 from browser_use import ActionResult, Tools
 from browser_use.browser import BrowserSession
+from browser_use.llm import ChatOpenAI
 from browser_use.llm.base import BaseChatModel
+from browser_use.llm.exceptions import ModelProviderError, ModelRateLimitError
 from browser_use.llm.messages import (
     ContentPartImageParam,
     ContentPartTextParam,
@@ -21,13 +32,107 @@ from browser_use.llm.messages import (
     SystemMessage,
     UserMessage,
 )
+from browser_use.llm.openai.serializer import OpenAIMessageSerializer
 
 from study_agent.prompts import SOLVER_SYSTEM_PROMPT
+from study_agent.llm_factory import with_token_budget
 from study_agent.event_bus import EventBus, EventType
 from study_agent.store.history import HistoryStore
+from study_agent.tools.semantic_cache import get_semantic_cache
+from study_agent.tools._fast_parser import (
+    ANSWER_MARKER,
+    QTYPE_AUTO,
+    QTYPE_IDX,
+    QTYPE_LIMITS,
+    REASONING_MARKER,
+    has_answer_marker,
+    parse_solver_response,
+    truncate_reasoning,
+)
+
+try:
+    # pybase64 基于 SIMD 实现，接口与标准库 base64 一致；未安装时回退标准库
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 logger = logging.getLogger("study_agent")
 
+# 答案缓存：同一会话内重复出现的题目直接复用上次的解答，跳过 Solver 调用
+_ANSWER_CACHE_MAX_SIZE = 512
+_ANSWER_CACHE: OrderedDict[str, tuple[str, str]] = OrderedDict()
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 题型标签（【单选题】、判断题：、True or False: 等）；剥离后若不剩任何文字，
+# 说明 Browser Agent 只提取到了标签，仅凭文本无法作答
+_QUESTION_LABEL_RE = re.compile(
+    r"[【\[(（]?\s*(?:单选题|多选题|不定项选择题|选择题|判断题|填空题|简答题|论述题|true\s*or\s*false|true\s*/\s*false)"
+    r"\s*[】\])）]?\s*[:：]?",
+    re.I,
+)
+
+# 题干提及视觉元素的提示词（英文按小写匹配）。填空/判断题中不含这些词时，
+# 即使 Browser Agent 要求截图也按纯文字题处理，省去截图、编码与图像 token
+_IMAGE_TRIGGERS = frozenset({
+    "图", "几何", "chart", "figure", "graph", "image", "picture", "diagram", "plot",
+})
+_TEXT_ONLY_QTYPES = frozenset({"fill", "judge"})
+
+# 选项标号（A. / B、/ (C) / D：等），用于识别未标注题型的选择题
+_OPTION_LABEL_RE = re.compile(r"(?<![A-Za-z0-9])([A-H])\s*[.．、:：)）]")
+
+# 进行中的 Solver 调用（键：题目标识 + 截图摘要），并发的相同请求共享同一次调用
+_INFLIGHT: dict[str, asyncio.Task[tuple[str, str]]] = {}
+
+# 截图格式：WebP（有损，quality 0-100）
+_SCREENSHOT_FORMAT = "webp"
+_SCREENSHOT_QUALITY = 80
+_SCREENSHOT_MEDIA_TYPE = "image/webp"
+_DATA_URL_PREFIX = f"data:{_SCREENSHOT_MEDIA_TYPE};base64,"
+# 超出该边界框的截图（如 HiDPI 屏幕）等比缩小后再发送，视觉 token 随像素数下降
+_SCREENSHOT_MAX_SIZE = (1280, 1280)
+
+# 最近一次截图的 (CDP 返回的 base64, (base64 编码, data URL, 内容摘要))，只保留一条
+_last_screenshot: tuple[str, tuple[str, str, str]] | None = None
+
+# 题型提示与默认答案格式要求，按 QTYPE_IDX 下标索引，导入时预先渲染
+_TYPE_HINTS = (
+    "\n\n提示：这是一道选择题",
+    "\n\n提示：这是一道判断题",
+    "\n\n提示：这是一道填空题",
+    "\n\n提示：这是一道简答题/论述题",
+    "",
+)
+_FORMAT_HINT_PREFIX = "\n\n答案格式要求："
+_DEFAULT_FORMAT_HINTS = (
+    "",
+    "",
+    _FORMAT_HINT_PREFIX + "请优先使用小数形式（保留两位小数），不要使用 LaTeX 或特殊符号。",
+    "",
+    "",
+)
+# 未给出格式要求时题干之后的完整后缀（题型提示 + 默认格式要求）
+_DEFAULT_PROMPT_SUFFIXES = tuple(t + f for t, f in zip(_TYPE_HINTS, _DEFAULT_FORMAT_HINTS))
+_USER_TEXT_PREFIX = "请解答以下题目：\n\n"
+
+# 多模态消息中截图前的固定说明，内容不变，各次调用共用同一对象
+_SCREENSHOT_INTRO_PART = ContentPartTextParam(
+    text="\n以下是题目所在页面的截图，请结合截图中的视觉信息（图表、图形、公式等）进行解题："
+)
+
+# 各题型 Solver 输出 token 上限（按 QTYPE_IDX 下标）：选择/判断题无需长篇推理，
+# 限制解码长度可缩短尾延迟。只会调低、不会超过配置值
+_QTYPE_MAX_TOKENS = (256, 256, 768, 4096, 1024)
+
+# Solver 输出文本的硬上限（字符）：超出部分的推理无论如何都会被截断，
+# 提前截掉可使解析与截断的开销与模型输出长度无关
+_SOLVER_OUTPUT_MAX_CHARS = 16384
+
+# 系统提示词为常量，消息对象构建一次后在各次调用间复用（序列化时不会被修改）。
+# 前缀在各次调用间保持一致，cache=True 让 Anthropic 缓存该段（其他 Provider 忽略此标记，
+# OpenAI 等按相同前缀自动缓存）
+_SOLVER_SYSTEM_MESSAGE = SystemMessage(content=SOLVER_SYSTEM_PROMPT, cache=True)
+
 
 # ============================================================
 # 参数模型
@@ -55,42 +160,380 @@ class SolveQuestionParams(BaseModel):
                     "当题目包含图片、图表、几何图形、函数图像、化学结构式、电路图等视觉元素时设为 true。"
                     "纯文字题目保持 false 以节省资源。",
     )
+    image_detail: Literal["low", "high"] = Field(
+        default="low",
+        description="截图的识别精度（仅 include_screenshot=true 时生效）。"
+                    "默认 low 即可看清页面文字与普通插图；"
+                    "仅当题目依赖几何图形、函数图像、图表刻度等精细视觉信息时设为 high。",
+    )
+
+    @field_validator("question")
+    @classmethod
+    def _normalize_question(cls, value: str) -> str:
+        """只去除首尾空白；行内空白（代码缩进、对齐的表格）原样保留给 Solver 与历史记录。"""
+        return value.strip()
+
+    @cached_property
+    def normalized_key(self) -> str:
+        """用于缓存键、去重与纯文本判定的题目形式：合并全部空白并转小写，按需计算一次。"""
+        return _WHITESPACE_RE.sub(" ", self.question.lower())
 
 
 # ============================================================
-# 答案解析
+# Solver 调用
 # ============================================================
-def parse_solver_response(answer_text: str) -> tuple[str, str]:
-    """从 Solver 返回的文本中解析 ANSWER 和 REASONING 部分。
+def _chunk_text(chunk: Any) -> str:
+    """提取流式分片中的文本（兼容 str / .content / .completion）。"""
+    if type(chunk) is str:
+        return chunk
+    for attr in ("content", "completion"):
+        value = getattr(chunk, attr, None)
+        if isinstance(value, str):
+            return value
+    return ""
+
+
+async def _openai_stream(llm: ChatOpenAI, messages: list) -> AsyncIterator[str]:
+    """以流式请求调用 OpenAI 兼容接口，逐段产出文本。
+
+    browser-use 的 ChatOpenAI 只提供 ``ainvoke``，这里复用其客户端、消息序列化器
+    与采样参数（与 ``ainvoke`` 的组装方式一致）直接发起 ``stream=True`` 请求。
+    生成器关闭时同时关闭响应流，服务端随之停止生成。
+    """
+    params: dict[str, Any] = {}
+    for name in ("temperature", "frequency_penalty", "max_completion_tokens", "top_p", "seed", "service_tier"):
+        value = getattr(llm, name)
+        if value is not None:
+            params[name] = value
+    if llm.reasoning_models and any(str(m).lower() in str(llm.model).lower() for m in llm.reasoning_models):
+        params["reasoning_effort"] = llm.reasoning_effort
+        params.pop("temperature", None)
+        params.pop("frequency_penalty", None)
+
+    # 异常与 ChatOpenAI.ainvoke 一样包装为 browser-use 的 ModelProviderError / ModelRateLimitError
+    try:
+        stream = await llm.get_client().chat.completions.create(
+            model=llm.model,
+            messages=OpenAIMessageSerializer.serialize_messages(messages),
+            stream=True,
+            **params,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+    except RateLimitError as e:
+        raise ModelRateLimitError(message=e.message, model=llm.name) from e
+    except APIConnectionError as e:
+        raise ModelProviderError(message=str(e), model=llm.name) from e
+    except APIStatusError as e:
+        raise ModelProviderError(message=e.message, status_code=e.status_code, model=llm.name) from e
+    except Exception as e:
+        raise ModelProviderError(message=str(e), model=llm.name) from e
+
+
+def _solver_stream(llm: BaseChatModel, messages: list) -> AsyncIterator[Any] | None:
+    """返回 Solver 的流式输出；未设置 SOLVER_STREAM=true 或不支持流式时返回 None。
+
+    流式提前结束会丢弃超出截断长度的推理，历史记录中只保存截断后的推理，因此需显式开启。
+    """
+    if os.getenv("SOLVER_STREAM", "false").lower() not in ("true", "1", "yes"):
+        return None
+    astream = getattr(llm, "astream", None)
+    if astream is not None:
+        return astream(messages)
+    if isinstance(llm, ChatOpenAI):
+        return _openai_stream(llm, messages)
+    return None
 
-    Returns:
-        (answer_part, reasoning_part)
+
+async def complete_solver(llm: BaseChatModel, messages: list, reasoning_limit: int) -> str:
+    """调用 Solver LLM 并返回完整文本。
+
+    支持流式时边收边解析：ANSWER 先于 REASONING 输出，当 REASONING 已收到超过
+    ``reasoning_limit`` 个字符（之后的内容反正会被截断）即关闭流提前结束，
+    不再等待剩余推理生成。不支持流式时回退到 ``ainvoke``。
+
+    返回文本不超过 ``_SOLVER_OUTPUT_MAX_CHARS``，偶发的失控长输出不会拖慢后续解析。
     """
-    answer_part = answer_text
-    reasoning_part = ""
-    if "ANSWER:" in answer_text:
-        after_answer = answer_text.split("ANSWER:", 1)[-1]
-        if "REASONING:" in after_answer:
-            answer_part = after_answer.split("REASONING:", 1)[0].strip()
-            reasoning_part = after_answer.split("REASONING:", 1)[1].strip()
-        else:
-            answer_part = after_answer.strip()
-    return answer_part, reasoning_part
+    stream = _solver_stream(llm, messages)
+    if stream is None:
+        response = await llm.ainvoke(messages)
+        completion = response.completion
+        text = completion if type(completion) is str else str(completion)
+        return text[:_SOLVER_OUTPUT_MAX_CHARS]
+
+    buffer = ""
+    reasoning_start = -1
+    try:
+        async for chunk in stream:
+            scan_from = max(0, len(buffer) - len(REASONING_MARKER))
+            buffer += _chunk_text(chunk)
+            if len(buffer) >= _SOLVER_OUTPUT_MAX_CHARS:
+                logger.info("⏩ Solver 输出超过长度上限，提前结束流式输出")
+                break
+            if reasoning_start < 0:
+                idx = buffer.find(REASONING_MARKER, scan_from)
+                if idx < 0 or buffer.find(ANSWER_MARKER, 0, idx) < 0:
+                    continue
+                reasoning_start = idx + len(REASONING_MARKER)
+            if len(buffer) - reasoning_start > reasoning_limit:
+                logger.info("⏩ 推理已超过截断长度，提前结束 Solver 流式输出")
+                break
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return buffer[:_SOLVER_OUTPUT_MAX_CHARS]
+
+
+# ============================================================
+# 预检
+# ============================================================
+def _lacks_question_text(question: str) -> bool:
+    """判断题目文本去掉题型标签后是否已不含任何文字或数字。"""
+    stripped = _QUESTION_LABEL_RE.sub("", question)
+    return not any(ch.isalnum() for ch in stripped)
+
+
+def _has_options(params: SolveQuestionParams) -> bool:
+    """判断是否为带选项的题目（选择题，或题干中出现两个及以上选项标号）。
+
+    选项顺序可能打乱，复用相似题目的选项字母会答错，这类题目不走语义缓存。
+    """
+    if params.question_type == "choice":
+        return True
+    labels = {match.group(1) for match in _OPTION_LABEL_RE.finditer(params.question)}
+    return len(labels) >= 2
+
+
+def _is_text_only(params: SolveQuestionParams) -> bool:
+    """填空/判断题的题干中没有任何视觉元素提示词时，视为纯文字题。"""
+    if params.question_type not in _TEXT_ONLY_QTYPES:
+        return False
+    text = params.normalized_key
+    return not any(trigger in text for trigger in _IMAGE_TRIGGERS)
+
+
+# ============================================================
+# 答案缓存
+# ============================================================
+def _solver_identity(llm: BaseChatModel) -> str:
+    """Solver 的 Provider 与模型名，纳入题目标识，切换模型后不会复用旧模型的答案。"""
+    return f"{getattr(llm, 'provider', '')}|{getattr(llm, 'model', '')}"
+
+
+def _question_key(params: SolveQuestionParams, solver_id: str) -> str:
+    """以 Solver 标识、规范化后的题目文本（合并空白、转小写）及题型、格式要求生成题目标识。
+
+    每次调用只计算一次，同时用作日志标签、答案缓存键与进行中请求的去重键。
+    答案缓存为进程级，Web 模式下可在设置中更换 Solver 后开始新任务，因此键中含 ``solver_id``。
+    """
+    raw = f"{solver_id}|{params.question_type}|{params.answer_format_hint.strip().lower()}|{params.normalized_key}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _get_cached_answer(key: str) -> tuple[str, str] | None:
+    """读取缓存的 (answer_part, reasoning_part)，命中时刷新 LRU 顺序。"""
+    cached = _ANSWER_CACHE.get(key)
+    if cached is not None:
+        _ANSWER_CACHE.move_to_end(key)
+    return cached
+
+
+def _put_cached_answer(key: str, value: tuple[str, str]) -> None:
+    """写入答案缓存，超过容量时淘汰最久未使用的条目。"""
+    _ANSWER_CACHE[key] = value
+    _ANSWER_CACHE.move_to_end(key)
+    while len(_ANSWER_CACHE) > _ANSWER_CACHE_MAX_SIZE:
+        _ANSWER_CACHE.popitem(last=False)
+
+
+# ============================================================
+# 截图
+# ============================================================
+async def _capture_screenshot(browser_session: BrowserSession) -> str:
+    """截取当前视口，由 Chromium 直接编码为 WebP，原样返回 CDP 给出的 base64 字符串。
+
+    与 ``BrowserSession.take_screenshot`` 走同一条 CDP 调用。网页截图的 WebP
+    体积通常只有 PNG 的几分之一，base64 载荷与多模态输入 token 随之减少；
+    ``optimizeForSpeed`` 让浏览器端选用最快的编码参数。
+    """
+    cdp_session = await browser_session.get_or_create_cdp_session()
+    result = await cdp_session.cdp_client.send.Page.captureScreenshot(
+        params={
+            "format": _SCREENSHOT_FORMAT,
+            "quality": _SCREENSHOT_QUALITY,
+            "captureBeyondViewport": False,
+            "optimizeForSpeed": True,
+        },
+        session_id=cdp_session.session_id,
+    )
+    if not result or "data" not in result:
+        raise RuntimeError("截图失败：CDP 未返回图像数据")
+    return result["data"]
 
 
-def truncate_reasoning(reasoning: str, question_type: str) -> str:
-    """根据题目类型截断推理文本，避免返回内容过长。"""
-    limits = {
-        "choice": 200,
-        "judge": 150,
-        "fill": 300,
-        "essay": 1500,
-        "auto": 500,
-    }
-    max_len = limits.get(question_type, 500)
-    if len(reasoning) <= max_len:
-        return reasoning
-    return reasoning[:max_len] + "...(推理已截断)"
+def _downscale_screenshot(image_bytes: bytes) -> bytes | None:
+    """超出边界框时等比缩小并重新编码为 WebP；尺寸在边界框内时返回 None。"""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        max_width, max_height = _SCREENSHOT_MAX_SIZE
+        if img.width <= max_width and img.height <= max_height:
+            return None
+        img.thumbnail(_SCREENSHOT_MAX_SIZE, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="WEBP", quality=_SCREENSHOT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _encode_screenshot(data: str) -> tuple[str, str, str]:
+    """处理 CDP 返回的 base64 截图，返回 (base64, data URL, 内容摘要)；页面未变化时复用上一次的结果。
+
+    CDP 已经给出 base64 编码的 WebP，尺寸在 ``_SCREENSHOT_MAX_SIZE`` 以内时直接
+    沿用该字符串；解码只用于读取尺寸与计算摘要，仅在需要缩放时才重新编码。
+
+    连续几道题之间页面往往没有变化，截图完全相同；字符串比较（memcmp）远比解码、
+    缩放与摘要计算便宜，且按内容精确匹配，不存在哈希碰撞误用旧图的风险。
+
+    CPU 密集，调用方应通过 ``asyncio.to_thread`` 在工作线程中执行；缓存整体
+    以单个元组读写，多线程下也只会多处理一次、不会读到不一致的状态。
+    """
+    global _last_screenshot
+    cached = _last_screenshot
+    if cached is not None and cached[0] == data:
+        return cached[1]
+    image_bytes = base64.b64decode(data)
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    resized = _downscale_screenshot(image_bytes)
+    encoded = data if resized is None else base64.b64encode(resized).decode("ascii")
+    result = (encoded, _DATA_URL_PREFIX + encoded, digest)
+    _last_screenshot = (data, result)
+    return result
+
+
+# ============================================================
+# 输出长度控制
+# ============================================================
+def _has_hidden_reasoning(llm: BaseChatModel) -> bool:
+    """判断模型的隐藏思考是否计入输出 token 上限（收紧上限会让其思考耗尽预算、返回空文本）。
+
+    OpenAI 推理模型沿用 ``ChatOpenAI.ainvoke`` 的 ``reasoning_models`` 匹配规则；
+    Gemini 3 始终思考，Gemini 2.5 / gemini-flash 默认动态思考（thinking_budget=0 时关闭）。
+    """
+    model = str(getattr(llm, "model", "")).lower()
+    reasoning_models = getattr(llm, "reasoning_models", None)
+    if reasoning_models and any(str(m).lower() in model for m in reasoning_models):
+        return True
+    if "gemini-3" in model:
+        return True
+    if "gemini-2.5" in model or "gemini-flash" in model:
+        return getattr(llm, "thinking_budget", None) != 0
+    return False
+
+
+def _solver_variants(llm: BaseChatModel) -> tuple[BaseChatModel, ...]:
+    """按 QTYPE_IDX 下标为各题型准备 Solver 实例。
+
+    SOLVER_ADAPTIVE_MAX_TOKENS=false 或 Solver 为推理/思考模型时全部使用原实例。
+    未能识别的推理模型在收紧的上限内答不出时，由 solve_question 改用原实例重试。
+    """
+    adaptive = os.getenv("SOLVER_ADAPTIVE_MAX_TOKENS", "true").lower() in ("true", "1", "yes")
+    if not adaptive:
+        return (llm,) * len(_QTYPE_MAX_TOKENS)
+    if _has_hidden_reasoning(llm):
+        logger.info("⚙️ Solver 为推理模型，隐藏思考计入输出上限，不按题型收紧 token 上限")
+        return (llm,) * len(_QTYPE_MAX_TOKENS)
+    return tuple(with_token_budget(llm, budget) for budget in _QTYPE_MAX_TOKENS)
+
+
+# ============================================================
+# 请求合并调度
+# ============================================================
+class SolverBatcher:
+    """合并已排队的并发 Solver 请求，成批并行发往 LLM。
+
+    首个请求立即发出，同时带上队列中已在等待的请求（最多 ``batch_size`` 个），
+    使各请求的网络与推理耗时相互重叠（共享的 HTTP/2 客户端上多路复用）。
+    browser-use 按顺序执行同一步内的多个动作，单个请求不应为等待“可能到来”的
+    请求而延迟，因此 ``batch_window_ms`` 默认为 0；仅在多个 Agent 共用同一调度器、
+    确有并发请求时才值得设置等待窗口。后台任务按需启动，队列清空后自动退出。
+
+    Provider 的离线批处理接口（OpenAI / Anthropic Batch 等）以分钟到小时计返回，
+    不适合需要即时作答的交互场景，因此批内请求仍逐个实时调用。
+    """
+
+    def __init__(self, llm: BaseChatModel, batch_size: int = 8, batch_window_ms: float = 0) -> None:
+        self._llm = llm
+        self._batch_size = max(1, batch_size)
+        self._batch_window = max(0.0, batch_window_ms) / 1000
+        self._queue: asyncio.Queue[tuple[BaseChatModel, list, int, asyncio.Future]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls, llm: BaseChatModel) -> "SolverBatcher":
+        """从环境变量 SOLVER_BATCH_SIZE / SOLVER_BATCH_WINDOW_MS 读取调度参数。"""
+        try:
+            batch_size = int(os.getenv("SOLVER_BATCH_SIZE", "8"))
+        except ValueError:
+            batch_size = 8
+        try:
+            batch_window_ms = float(os.getenv("SOLVER_BATCH_WINDOW_MS", "0"))
+        except ValueError:
+            batch_window_ms = 0.0
+        return cls(llm, batch_size=batch_size, batch_window_ms=batch_window_ms)
+
+    async def complete(
+        self,
+        messages: list,
+        reasoning_limit: int,
+        llm: BaseChatModel | None = None,
+    ) -> str:
+        """提交一次 Solver 调用并等待其返回文本。``llm`` 为空时使用构造时传入的实例。"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((llm or self._llm, messages, reasoning_limit, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            # 先取走已排队的请求，无需等待
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            deadline = loop.time() + self._batch_window
+            while len(batch) < self._batch_size and self._batch_window > 0:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 不等待本批完成即继续收集下一批，避免后到的请求被前一批阻塞
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[BaseChatModel, list, int, asyncio.Future]]) -> None:
+        if len(batch) > 1:
+            logger.info("📦 合并 %d 个 Solver 请求并行调用", len(batch))
+        results = await asyncio.gather(
+            *(complete_solver(llm, messages, limit) for llm, messages, limit, _ in batch),
+            return_exceptions=True,
+        )
+        for (*_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
 
 
 # ============================================================
@@ -104,17 +547,49 @@ def register_solver_tool(
     session_id_getter: Callable[[], int | None] | None = None,
 ) -> None:
     """向 Tools 实例注册 solve_question 自定义工具。"""
+    batcher = SolverBatcher.from_env(solver_llm)
+    solver_variants = _solver_variants(solver_llm)
+    solver_id = _solver_identity(solver_llm)
+    semantic_cache = get_semantic_cache()
+    screenshot_gate = os.getenv("SOLVER_SCREENSHOT_GATE", "true").lower() in ("true", "1", "yes")
 
     @tools.action(
         "Solve a question: send the complete question text to the solver AI and get the answer. "
         "You MUST use this tool for every question before filling in answers on the page. "
         "Include the full question text with all options. "
-        "Set include_screenshot=true when the question contains images, charts, graphs, geometric figures, or other visual elements.",
+        "Set include_screenshot=true when the question contains images, charts, graphs, geometric figures, or other visual elements; "
+        "also set image_detail='high' only when fine visual detail (geometry, function plots, chart scales) matters.",
         param_model=SolveQuestionParams,
     )
     async def solve_question(params: SolveQuestionParams, browser_session: BrowserSession) -> ActionResult:
         """调用 Solver LLM 解答题目，返回推理过程和答案。支持多模态（文本+截图）。"""
-        logger.info(f"🧠 Solver 收到题目：{params.question[:80]}...")
+        qkey = _question_key(params, solver_id)
+        logger.info("🧠 Solver 收到题目 [%s]：%.80s...", qkey, params.question)
+
+        # 只有题型标签、没有题干且未附截图时，Solver 也无从作答，直接让 Browser Agent 重新提取
+        lacks_text = _lacks_question_text(params.question)
+        if not params.include_screenshot and lacks_text:
+            logger.info("⏭️ 题目缺少题干内容，跳过 Solver 调用")
+            return ActionResult(
+                extracted_content=(
+                    "ANSWER: (unable to determine from text alone)\n\n"
+                    "题目文本只有题型标签、缺少题干内容。请重新提取完整题目（含题干与选项），"
+                    "或设置 include_screenshot=true 后再次调用 solve_question。"
+                ),
+            )
+
+        include_screenshot = params.include_screenshot
+        if include_screenshot and screenshot_gate and not lacks_text and _is_text_only(params):
+            logger.info("🚫 [%s] 纯文字填空/判断题无需截图，忽略 include_screenshot", qkey)
+            include_screenshot = False
+
+        # 截图是纯浏览器 I/O，先行发起，CDP 往返期间继续处理事件与提示文本
+        screenshot_task: asyncio.Task[str] | None = None
+        if include_screenshot:
+            screenshot_task = asyncio.create_task(_capture_screenshot(browser_session))
+
+        qtype_idx = QTYPE_IDX.get(params.question_type, QTYPE_AUTO)
+        reasoning_limit = QTYPE_LIMITS[qtype_idx]
         if event_bus:
             await event_bus.emit(
                 EventType.QUESTION_FOUND,
@@ -124,47 +599,45 @@ def register_solver_tool(
                 },
             )
 
-        # ---- 按需截图 ----
+        # ---- 构建题目提示文本（固定部分均已预先渲染） ----
+        if params.answer_format_hint:
+            user_text = "".join((
+                _USER_TEXT_PREFIX,
+                params.question,
+                _TYPE_HINTS[qtype_idx],
+                _FORMAT_HINT_PREFIX,
+                params.answer_format_hint,
+            ))
+        else:
+            user_text = _USER_TEXT_PREFIX + params.question + _DEFAULT_PROMPT_SUFFIXES[qtype_idx]
+
+        # ---- 等待截图 ----
         screenshot_b64: str | None = None
-        if params.include_screenshot:
+        screenshot_url: str | None = None
+        screenshot_digest: str | None = None
+        if screenshot_task is not None:
             try:
-                screenshot_bytes = await browser_session.take_screenshot(full_page=False)
-                screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
-                logger.info(f"📸 已捕获页面截图（{len(screenshot_bytes)} bytes），将发送给 Solver")
+                screenshot_data = await screenshot_task
+                # 解码、缩放与摘要计算放到工作线程，避免阻塞事件循环上的其他浏览器操作与 LLM 流
+                screenshot_b64, screenshot_url, screenshot_digest = await asyncio.to_thread(
+                    _encode_screenshot, screenshot_data
+                )
+                logger.info("📸 已捕获页面截图（base64 %d 字符），将发送给 Solver", len(screenshot_data))
                 if event_bus:
                     await event_bus.emit(EventType.SCREENSHOT, {"image": screenshot_b64})
             except Exception as e:
-                logger.warning(f"⚠️ 截图失败，将仅使用文本解题：{e}")
-
-        # ---- 构建题目提示文本 ----
-        type_hint = ""
-        if params.question_type != "auto":
-            type_map = {
-                "choice": "这是一道选择题",
-                "fill": "这是一道填空题",
-                "judge": "这是一道判断题",
-                "essay": "这是一道简答题/论述题",
-            }
-            type_hint = f"\n\n提示：{type_map.get(params.question_type, '')}"
-
-        format_hint = ""
-        if params.answer_format_hint:
-            format_hint = f"\n\n答案格式要求：{params.answer_format_hint}"
-        elif params.question_type == "fill":
-            format_hint = "\n\n答案格式要求：请优先使用小数形式（保留两位小数），不要使用 LaTeX 或特殊符号。"
-
-        user_text = f"请解答以下题目：\n\n{params.question}{type_hint}{format_hint}"
+                logger.warning("⚠️ 截图失败，将仅使用文本解题：%s", e)
 
         # ---- 构建消息（支持多模态） ----
-        if screenshot_b64:
+        if screenshot_url:
             user_message = UserMessage(content=[
                 ContentPartTextParam(text=user_text),
-                ContentPartTextParam(text="\n以下是题目所在页面的截图，请结合截图中的视觉信息（图表、图形、公式等）进行解题："),
+                _SCREENSHOT_INTRO_PART,
                 ContentPartImageParam(
                     image_url=ImageURL(
-                        url=f"data:image/png;base64,{screenshot_b64}",
-                        media_type="image/png",
-                        detail="high",
+                        url=screenshot_url,
+                        media_type=_SCREENSHOT_MEDIA_TYPE,
+                        detail=params.image_detail,
                     )
                 ),
             ])
@@ -172,26 +645,74 @@ def register_solver_tool(
         else:
             user_message = UserMessage(content=user_text)
 
-        messages = [
-            SystemMessage(content=SOLVER_SYSTEM_PROMPT),
-            user_message,
-        ]
-
-        if event_bus:
-            await event_bus.emit(EventType.SOLVER_CALLING, {})
-
-        # 调用独立的 Solver LLM
-        response = await solver_llm.ainvoke(messages)
-        answer_text = response.completion if isinstance(response.completion, str) else str(response.completion)
+        # ---- 查询答案缓存（精确缓存不含截图；语义缓存按格式要求与截图摘要区分） ----
+        cache_key: str | None = None
+        cached: tuple[str, str] | None = None
+        if not screenshot_b64:
+            cache_key = qkey
+            cached = _get_cached_answer(cache_key)
+        use_semantic = semantic_cache is not None and not _has_options(params)
+        format_hint_key = params.answer_format_hint.strip().lower()
+        if cached is None and use_semantic and semantic_cache is not None:
+            cached = await semantic_cache.lookup(
+                params.question, params.question_type, format_hint_key, screenshot_digest
+            )
 
-        logger.info(f"✅ Solver 返回答案 ({len(answer_text)} 字符)")
+        async def call_solver() -> tuple[str, str]:
+            messages = [_SOLVER_SYSTEM_MESSAGE, user_message]
+
+            if event_bus:
+                await event_bus.emit(EventType.SOLVER_CALLING, {})
+
+            # 调用独立的 Solver LLM
+            solver = solver_variants[qtype_idx]
+            answer_text = await batcher.complete(messages, reasoning_limit, solver)
+
+            logger.info("✅ Solver 返回答案 (%d 字符)", len(answer_text))
+
+            # 解析答案
+            answer_part, reasoning_part = parse_solver_response(answer_text)
+
+            # 未识别出的推理模型（如 OpenAI 兼容端点上的 DeepSeek-R1 / QwQ）会把 <think>
+            # 计入输出上限，收紧后的实例可能只返回思考内容或空答案，此时用原实例重试一次
+            if solver is not solver_llm and (not answer_part or not has_answer_marker(answer_text)):
+                logger.warning("⚠️ Solver 在收紧的 token 上限内未给出答案 [%s]，不限上限重试", qkey)
+                answer_text = await batcher.complete(messages, reasoning_limit, solver_llm)
+                logger.info("✅ Solver 返回答案 (%d 字符)", len(answer_text))
+                answer_part, reasoning_part = parse_solver_response(answer_text)
+            logger.info("✅ 解析答案 [%s]：%s", qkey, answer_part)
+
+            if cache_key and answer_part:
+                _put_cached_answer(cache_key, (answer_part, reasoning_part))
+            if use_semantic and answer_part and semantic_cache is not None:
+                await semantic_cache.add(
+                    params.question,
+                    params.question_type,
+                    format_hint_key,
+                    screenshot_digest,
+                    answer_part,
+                    reasoning_part,
+                )
+            return answer_part, reasoning_part
 
-        # 解析答案
-        answer_part, reasoning_part = parse_solver_response(answer_text)
-        logger.info(f"✅ 解析答案：{answer_part}")
+        if cached is not None:
+            answer_part, reasoning_part = cached
+            logger.info("♻️ 命中答案缓存 [%s]，跳过 Solver 调用：%s", qkey, answer_part)
+        else:
+            # 相同题目（含截图）的调用正在进行时直接等待其结果，不重复调用 Solver；
+            # shield 保证某个调用方被取消时，共享的调用仍继续为其他调用方完成
+            inflight_key = f"{qkey}|{screenshot_digest or ''}"
+            solver_task = _INFLIGHT.get(inflight_key)
+            if solver_task is None:
+                solver_task = asyncio.create_task(call_solver())
+                _INFLIGHT[inflight_key] = solver_task
+                solver_task.add_done_callback(lambda _: _INFLIGHT.pop(inflight_key, None))
+            else:
+                logger.info("🔗 相同题目 [%s] 的 Solver 调用进行中，等待其结果", qkey)
+            answer_part, reasoning_part = await asyncio.shield(solver_task)
 
         # 截断推理
-        truncated_reasoning = truncate_reasoning(reasoning_part, params.question_type)
+        truncated_reasoning = truncate_reasoning(reasoning_part, params.question_type, reasoning_limit)
 
         # 组装返回内容
         result_content = f"ANSWER: {answer_part}"
@@ -4,6 +4,7 @@ import asyncio
 import json
 import logging
 import webbrowser
+from dataclasses import replace
 from urllib.parse import quote
 from urllib.request import Request as UrlRequest
 from urllib.request import urlopen
@@ -99,7 +100,7 @@ async def start_task(request: Request, body: StartTaskRequest) -> dict:
         try:
             chrome_manager = ChromeManager(port=config.browser.cdp_port)
             cdp_url = await chrome_manager.ensure_running()
-            config.browser.cdp_url = cdp_url
+            config = replace(config, browser=replace(config.browser, cdp_url=cdp_url))
             request.app.state.chrome_manager = chrome_manager
         except Exception as exc:
             error_text = f"Chrome 调试连接失败：{exc}"
@@ -14,6 +14,7 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from study_agent.llm_factory import aclose_http_client
 from study_agent.store.history import HistoryStore
 
 
@@ -34,6 +35,8 @@ async def lifespan(app: FastAPI):
         await app.state.agent_app.cleanup()
     if app.state.chrome_manager:
         app.state.chrome_manager.shutdown()
+    # 共享 HTTP 客户端由各任务与配置校验共用，只在服务器退出时关闭
+    await aclose_http_client()
 
 
 app = FastAPI(title="StudyAgent", lifespan=lifespan)
@@ -33,6 +33,12 @@ window.agentWS = new StudyAgentWS();
 
 const DASHBOARD_STATE_KEY = 'studyagent.dashboard.state.v2';
 
+// 截图为 WebP；历史记录中较早的截图为 PNG，按 base64 头部识别格式
+window.imageDataUrl = function (b64) {
+    const mime = b64.startsWith('iVBOR') ? 'image/png' : 'image/webp';
+    return `data:${mime};base64,${b64}`;
+};
+
 window.dashboard = function () {
     return {
         status: 'idle',
@@ -442,7 +448,7 @@ window.reviewPage = function () {
                     return;
                 }
                 const data = await res.json();
-                q._screenshotSrc = `data:image/png;base64,${data.screenshot_b64}`;
+                q._screenshotSrc = imageDataUrl(data.screenshot_b64);
                 q._screenshotLoaded = true;
             } catch (e) {
                 console.error('加载截图失败', e);